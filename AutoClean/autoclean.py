@@ -5,6 +5,7 @@
 import os
 import sys
 from timeit import default_timer as timer
+import numpy as np
 import pandas as pd
 from loguru import logger
 from AutoClean.modules import *
@@ -139,9 +140,34 @@ class AutoClean:
         # function for starting the autoclean process
         df = df.reset_index(drop=True)
         df = Duplicates.handle(self, df)
+        self._int_like = dict()
+        self._cached_rows = len(df)
+        self._datetime_cols = set()
+        self._onehot_cols = set()
+        self._cache_num_features(df)
         df = MissingValues.handle(self, df)
+        self._cache_num_features(df) # observations may have been deleted
         df = Outliers.handle(self, df)    
+        self._cache_num_features(df) # observations may have been deleted
         df = Adjust.convert_datetime(self, df) 
         df = EncodeCateg.handle(self, df)     
+        self._cache_num_features(df) # features added by datetime extraction and encoding
         df = Adjust.round_values(self, df, input_data)
         return df 
+
+    def _cache_num_features(self, df):
+        # function for caching the numerical features and whether they only hold integer values
+        if len(df) != self._cached_rows:
+            # deleting observations can turn features integer-valued, so recompute all of them
+            self._int_like = dict()
+            self._cached_rows = len(df)
+        # onehot encoded features are already compact uint8 and are left out of the type conversion
+        self._cols_num = df.select_dtypes(include=np.number).columns.difference(list(self._onehot_cols), sort=False)
+        self._update_int_like(df, [feature for feature in self._cols_num if feature not in self._int_like])
+        return
+
+    def _update_int_like(self, df, features):
+        # function for (re)computing whether features only hold integer values, called by every stage that rewrites values
+        for feature in features:
+            self._int_like[feature] = (df[feature].fillna(-9999) % 1  == 0).all()
+        return
@@ -5,8 +5,6 @@
 from timeit import default_timer as timer
 import numpy as np
 import pandas as pd
-from math import isnan
-from sklearn import preprocessing
 from sklearn.impute import KNNImputer, SimpleImputer
 from sklearn.linear_model import LinearRegression
 from sklearn.linear_model import LogisticRegression
@@ -14,6 +12,11 @@ from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 from loguru import logger
 import warnings
+try:
+    # optional GPU accelerated K-NN imputation for large datasets
+    from cuml.experimental.preprocessing import KNNImputer as GPUKNNImputer
+except ImportError:
+    GPUKNNImputer = None
 warnings.filterwarnings('ignore')
 
 '''
@@ -42,7 +45,7 @@ class MissingValues:
                         lr = LinearRegression()
                         df = MissingValues._lin_regression_impute(self, df, lr)
                         self.missing_num = 'knn'
-                        imputer = KNNImputer(n_neighbors=_n_neighbors)
+                        imputer = MissingValues._knn_imputer(self, df, _n_neighbors)
                         df = MissingValues._impute(self, df, imputer, type='num')
                     # linear regression imputation
                     elif self.missing_num == 'linreg':
@@ -50,7 +53,7 @@ class MissingValues:
                         df = MissingValues._lin_regression_impute(self, df, lr)
                     # knn imputation
                     elif self.missing_num == 'knn':
-                        imputer = KNNImputer(n_neighbors=_n_neighbors)
+                        imputer = MissingValues._knn_imputer(self, df, _n_neighbors)
                         df = MissingValues._impute(self, df, imputer, type='num')
                     # mean, median or mode imputation
                     elif self.missing_num in ['mean', 'median', 'most_frequent']:
@@ -69,19 +72,18 @@ class MissingValues:
                         lr = LogisticRegression()
                         df = MissingValues._log_regression_impute(self, df, lr)
                         self.missing_categ = 'knn'
-                        imputer = KNNImputer(n_neighbors=_n_neighbors)
+                        imputer = MissingValues._knn_imputer(self, df, _n_neighbors)
                         df = MissingValues._impute(self, df, imputer, type='categ')
                     elif self.missing_categ == 'logreg':
                         lr = LogisticRegression()
                         df = MissingValues._log_regression_impute(self, df, lr)
                     # knn imputation
                     elif self.missing_categ == 'knn':
-                        imputer = KNNImputer(n_neighbors=_n_neighbors)
+                        imputer = MissingValues._knn_imputer(self, df, _n_neighbors)
                         df = MissingValues._impute(self, df, imputer, type='categ')  
                     # mode imputation
                     elif self.missing_categ == 'most_frequent':
-                        imputer = SimpleImputer(strategy=self.missing_categ)
-                        df = MissingValues._impute(self, df, imputer, type='categ')
+                        df = MissingValues._mode_impute(self, df)
                     # delete missing values                    
                     elif self.missing_categ == 'delete':
                         df = MissingValues._delete(self, df, type='categ')
@@ -94,61 +96,83 @@ class MissingValues:
             logger.info('Skipped handling of missing values')
         return df
 
+    def _knn_imputer(self, df, n_neighbors, _gpu_min_rows=100000):
+        # function that returns the K-NN imputer, running on the GPU for large datasets if cuML is installed
+        if GPUKNNImputer is not None and len(df) >= _gpu_min_rows:
+            return GPUKNNImputer(n_neighbors=n_neighbors)
+        return KNNImputer(n_neighbors=n_neighbors)
+
     def _impute(self, df, imputer, type):
         # function for imputing missing values in the data
-        cols_num = df.select_dtypes(include=np.number).columns 
+        cols_num = self._cols_num
 
         if type == 'num':
-            # numerical features
-            for feature in df.columns: 
-                if feature in cols_num:
-                    if df[feature].isna().sum().sum() != 0:
-                        try:
-                            df_imputed = pd.DataFrame(imputer.fit_transform(np.array(df[feature]).reshape(-1, 1)))
-                            counter = df[feature].isna().sum().sum() - df_imputed.isna().sum().sum()
-
-                            if (df[feature].fillna(-9999) % 1  == 0).all():
-                                df[feature] = df_imputed
-                                # round back to INTs, if original data were INTs
-                                df[feature] = df[feature].round()
-                                df[feature] = df[feature].astype('Int64')                                        
-                            else:
-                                df[feature] = df_imputed
-                            if counter != 0:
-                                logger.debug('{} imputation of {} value(s) succeeded for feature "{}"', str(self.missing_num).upper(), counter, feature)
-                        except:
-                            logger.warning('{} imputation failed for feature "{}"', str(self.missing_num).upper(), feature)
+            # numerical features, imputed in one call on the whole numerical block
+            # features without any values cannot be imputed and are left untouched
+            cols_num = cols_num[df[cols_num].notna().any().to_numpy()]
+            nan_mask = df[cols_num].isna().to_numpy()
+            cols_missing = nan_mask.any(axis=0)
+            if cols_missing.any():
+                try:
+                    imputed = imputer.fit_transform(df[cols_num].to_numpy(dtype=np.float64, na_value=np.nan))
+                    int_like = np.array([self._int_like[feature] for feature in cols_num], dtype=bool)
+
+                    df[cols_num[cols_missing]] = imputed[:, cols_missing]
+                    # round back to INTs, if original data were INTs
+                    cols_int = cols_num[cols_missing & int_like]
+                    df[cols_int] = df[cols_int].round().astype('Int64')
+                    self._update_int_like(df, cols_num[cols_missing])
+
+                    for feature, counter in zip(cols_num, nan_mask.sum(axis=0)):
+                        if counter != 0:
+                            logger.debug('{} imputation of {} value(s) succeeded for feature "{}"', str(self.missing_num).upper(), counter, feature)
+                except:
+                    logger.warning('{} imputation failed for NUMERICAL features', str(self.missing_num).upper())
         else:
-            # categorical features
-            for feature in df.columns:
-                if feature not in cols_num:
-                    if df[feature].isna().sum()!= 0:
-                        try:
-                            mapping = dict()
-                            mappings = {k: i for i, k in enumerate(df[feature].dropna().unique(), 0)}
-                            mapping[feature] = mappings
-                            df[feature] = df[feature].map(mapping[feature])
-
-                            df_imputed = pd.DataFrame(imputer.fit_transform(np.array(df[feature]).reshape(-1, 1)), columns=[feature])    
-                            counter = sum(1 for i, j in zip(list(df_imputed[feature]), list(df[feature])) if i != j)
-
-                            # round to integers before mapping back to original values
-                            df[feature] = df_imputed
-                            df[feature] = df[feature].round()
-                            df[feature] = df[feature].astype('Int64')  
-
-                            # map values back to original
-                            mappings_inv = {v: k for k, v in mapping[feature].items()}
-                            df[feature] = df[feature].map(mappings_inv)
-                            if counter != 0:
-                                logger.debug('{} imputation of {} value(s) succeeded for feature "{}"', self.missing_categ.upper(), counter, feature)
-                        except:
-                            logger.warning('{} imputation failed for feature "{}"', str(self.missing_categ).upper(), feature)
+            # categorical features, each imputed on its own labels so unrelated features do not act as neighbours
+            # features without any values cannot be imputed and are left untouched
+            cols_categ = df.columns.difference(cols_num, sort=False)
+            cols_categ = cols_categ[df[cols_categ].notna().any().to_numpy()]
+            nan_mask = df[cols_categ].isna().to_numpy()
+            for feature, counter in zip(cols_categ, nan_mask.sum(axis=0)):
+                if counter != 0:
+                    try:
+                        # map categorical feature values to integer labels, missing values stay missing
+                        codes, uniques = pd.factorize(df[feature])
+                        labels = np.where(codes == -1, np.nan, codes).reshape(-1, 1)
+
+                        # round to integers before mapping back to original values
+                        imputed = np.rint(imputer.fit_transform(labels)[:, 0]).astype(np.int64)
+
+                        # map values back to original
+                        df[feature] = np.asarray(uniques, dtype=object)[imputed]
+                        logger.debug('{} imputation of {} value(s) succeeded for feature "{}"', self.missing_categ.upper(), counter, feature)
+                    except:
+                        logger.warning('{} imputation failed for feature "{}"', str(self.missing_categ).upper(), feature)
+        return df
+
+    def _mode_impute(self, df):
+        # function for imputing missing categorical values with the most frequent value
+        cols_categ = df.columns.difference(self._cols_num, sort=False)
+        counts = df[cols_categ].isna().sum()
+        modes = dict()
+        for feature in cols_categ:
+            codes, uniques = pd.factorize(df[feature])
+            codes = codes[codes != -1]
+            # features without any values have no mode and are left untouched
+            if codes.size != 0:
+                # on ties the value seen first wins
+                modes[feature] = uniques[np.bincount(codes).argmax()]
+        if modes:
+            df = df.fillna(modes)
+            for feature, counter in counts.items():
+                if counter != 0 and feature in modes:
+                    logger.debug('{} imputation of {} value(s) succeeded for feature "{}"', self.missing_categ.upper(), counter, feature)
         return df
 
     def _lin_regression_impute(self, df, model):
         # function for predicting missing values with linear regression
-        cols_num = df.select_dtypes(include=np.number).columns
+        cols_num = self._cols_num
         mapping = dict()
         for feature in df.columns:
             if feature not in cols_num:
@@ -179,13 +203,14 @@ class MissingValues:
 
                         test_df[feature]= pred
 
-                        if (df[feature].fillna(-9999) % 1  == 0).all():
+                        if self._int_like[feature]:
                             # round back to INTs, if original data were INTs
                             test_df[feature] = test_df[feature].round()
                             test_df[feature] = test_df[feature].astype('Int64')
                             df[feature].update(test_df[feature])                          
                         else:
                             df[feature].update(test_df[feature])  
+                        self._update_int_like(df, [feature])
                         logger.debug('LINREG imputation of {} value(s) succeeded for feature "{}"', len(pred), feature)
                 except:
                     logger.warning('LINREG imputation failed for feature "{}"', feature)
@@ -247,7 +272,7 @@ class MissingValues:
 
     def _delete(self, df, type):
         # function for deleting missing values
-        cols_num = df.select_dtypes(include=np.number).columns 
+        cols_num = self._cols_num
         if type == 'num':
             # numerical features
             for feature in df.columns: 
@@ -283,52 +308,56 @@ class Outliers:
 
     def _winsorization(self, df):
         # function for outlier winsorization
-        cols_num = df.select_dtypes(include=np.number).columns    
-        for feature in cols_num:           
-            counter = 0
-            # compute outlier bounds
-            lower_bound, upper_bound = Outliers._compute_bounds(self, df, feature)    
-            for row_index, row_val in enumerate(df[feature]):
-                if row_val < lower_bound or row_val > upper_bound:
-                    if row_val < lower_bound:
-                        if (df[feature].fillna(-9999) % 1  == 0).all():
-                                df.loc[row_index, feature] = lower_bound
-                                df[feature] = df[feature].astype(int) 
-                        else:    
-                            df.loc[row_index, feature] = lower_bound
-                        counter += 1
-                    else:
-                        if (df[feature].fillna(-9999) % 1  == 0).all():
-                            df.loc[row_index, feature] = upper_bound
-                            df[feature] = df[feature].astype(int) 
-                        else:
-                            df.loc[row_index, feature] = upper_bound
-                        counter += 1
-            if counter != 0:
-                logger.debug('Outlier imputation of {} value(s) succeeded for feature "{}"', counter, feature)        
+        if len(self._cols_num) == 0:
+            return df
+        # compute outlier bounds
+        lower_bounds, upper_bounds = Outliers._compute_bounds(self, df, self._cols_num)
+        for feature, lower_bound, upper_bound in zip(self._cols_num, lower_bounds, upper_bounds):
+            values = df[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            if not Outliers._exceeds_bounds(self, values, lower_bound, upper_bound):
+                continue
+            counter = np.count_nonzero((values < lower_bound) | (values > upper_bound))
+            # replace outliers by the bound they exceed
+            values = np.clip(values, lower_bound, upper_bound)
+            if self._int_like[feature]:
+                # cast INT features once, after all of their outliers are replaced
+                values = pd.Series(np.trunc(values), index=df.index).astype('Int64')
+            else:
+                # clipping can remove the only decimals of a FLOAT feature
+                self._int_like[feature] = bool(np.all(np.isnan(values) | (values % 1 == 0)))
+            df[feature] = values
+            logger.debug('Outlier imputation of {} value(s) succeeded for feature "{}"', counter, feature)
         return df
 
     def _delete(self, df):
         # function for deleting outliers in the data
-        cols_num = df.select_dtypes(include=np.number).columns    
-        for feature in cols_num:
-            counter = 0
-            lower_bound, upper_bound = Outliers._compute_bounds(self, df, feature)    
-            # delete observations containing outliers            
-            for row_index, row_val in enumerate(df[feature]):
-                if row_val < lower_bound or row_val > upper_bound:
-                    df = df.drop(row_index)
-                    counter +=1
-            df = df.reset_index(drop=True)
-            if counter != 0:
-                logger.debug('Deletion of {} outliers succeeded for feature "{}"', counter, feature)
+        if len(self._cols_num) == 0:
+            return df
+        lower_bounds, upper_bounds = Outliers._compute_bounds(self, df, self._cols_num)
+        keep = np.ones(len(df), dtype=bool)
+        for feature, lower_bound, upper_bound in zip(self._cols_num, lower_bounds, upper_bounds):
+            values = df[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            if not Outliers._exceeds_bounds(self, values, lower_bound, upper_bound):
+                continue
+            outliers = (values < lower_bound) | (values > upper_bound)
+            counter = np.count_nonzero(outliers)
+            keep &= ~outliers
+            logger.debug('Deletion of {} outliers succeeded for feature "{}"', counter, feature)
+        # delete observations containing outliers in one go
+        df = df.loc[keep].reset_index(drop=True)
         return df
 
-    def _compute_bounds(self, df, feature):
-        # function that computes the lower and upper bounds for finding outliers in the data
-        featureSorted = sorted(df[feature])
-        
-        q1, q3 = np.percentile(featureSorted, [25, 75])
+    def _exceeds_bounds(self, values, lower_bound, upper_bound):
+        # function that checks through the minimum and maximum whether any value lies outside the bounds
+        if values.size == 0:
+            return False
+        return np.nanmin(values) < lower_bound or np.nanmax(values) > upper_bound
+
+    def _compute_bounds(self, df, features):
+        # function that computes the lower and upper bounds for finding outliers in the data, for all features at once
+        values = df[features].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
         iqr = q3 - q1
 
         lb = q1 - (self.outlier_param * iqr) 
@@ -343,86 +372,129 @@ class Adjust:
         if self.extract_datetime:
             logger.info('Started conversion of DATETIME features... Granularity: {}', self.extract_datetime)
             start = timer()
-            cols = set(df.columns) ^ set(df.select_dtypes(include=np.number).columns) 
+            cols = df.columns.difference(self._cols_num, sort=False)
             for feature in cols: 
+                # convert features encoded as strings to type datetime ['D','M','Y','h','m','s']
+                dt = Adjust._parse_datetime(self, df, feature)
+                if dt is None:
+                    continue
+                df[feature] = dt
+                self._datetime_cols.add(feature)
                 try:
-                    # convert features encoded as strings to type datetime ['D','M','Y','h','m','s']
-                    df[feature] = pd.to_datetime(df[feature], infer_datetime_format=True)
-                    try:
-                        df['Day'] = pd.to_datetime(df[feature]).dt.day
+                    parts = dict()
+                    parts['Day'] = dt.dt.day
 
-                        if self.extract_datetime in ['auto', 'M','Y','h','m','s']:
-                            df['Month'] = pd.to_datetime(df[feature]).dt.month
+                    if self.extract_datetime in ['auto', 'M','Y','h','m','s']:
+                        parts['Month'] = dt.dt.month
 
-                            if self.extract_datetime in ['auto', 'Y','h','m','s']:
-                                df['Year'] = pd.to_datetime(df[feature]).dt.year
+                        if self.extract_datetime in ['auto', 'Y','h','m','s']:
+                            parts['Year'] = dt.dt.year
 
-                                if self.extract_datetime in ['auto', 'h','m','s']:
-                                    df['Hour'] = pd.to_datetime(df[feature]).dt.hour
+                            if self.extract_datetime in ['auto', 'h','m','s']:
+                                parts['Hour'] = dt.dt.hour
 
-                                    if self.extract_datetime in ['auto', 'm','s']:
-                                        df['Minute'] = pd.to_datetime(df[feature]).dt.minute
+                                if self.extract_datetime in ['auto', 'm','s']:
+                                    parts['Minute'] = dt.dt.minute
 
-                                        if self.extract_datetime in ['auto', 's']:
-                                            df['Sec'] = pd.to_datetime(df[feature]).dt.second
-                        
-                        logger.debug('Conversion to DATETIME succeeded for feature "{}"', feature)
-
-                        try: 
-                            # check if entries for the extracted dates/times are non-NULL, otherwise drop
-                            if (df['Hour'] == 0).all() and (df['Minute'] == 0).all() and (df['Sec'] == 0).all():
-                                df.drop('Hour', inplace = True, axis =1 )
-                                df.drop('Minute', inplace = True, axis =1 )
-                                df.drop('Sec', inplace = True, axis =1 )
-                            elif (df['Day'] == 0).all() and (df['Month'] == 0).all() and (df['Year'] == 0).all():
-                                df.drop('Day', inplace = True, axis =1 )
-                                df.drop('Month', inplace = True, axis =1 )
-                                df.drop('Year', inplace = True, axis =1 )   
-                        except:
-                            pass          
-                    except:
-                        # feature cannot be converted to datetime
-                        logger.warning('Conversion to DATETIME failed for "{}"', feature)
+                                    if self.extract_datetime in ['auto', 's']:
+                                        parts['Sec'] = dt.dt.second
+
+                    # check if entries for the extracted dates/times are non-NULL, otherwise drop
+                    if all(name in parts and (parts[name] == 0).all() for name in ['Hour', 'Minute', 'Sec']):
+                        for name in ['Hour', 'Minute', 'Sec']:
+                            del parts[name]
+                    elif all(name in parts and (parts[name] == 0).all() for name in ['Day', 'Month', 'Year']):
+                        for name in ['Day', 'Month', 'Year']:
+                            del parts[name]
+
+                    # add all extracted dates/times in one go
+                    df = df.assign(**parts)
+                    logger.debug('Conversion to DATETIME succeeded for feature "{}"', feature)
                 except:
-                    pass
+                    # feature cannot be converted to datetime
+                    logger.warning('Conversion to DATETIME failed for "{}"', feature)
             end = timer()
             logger.info('Completed conversion of DATETIME features in {} seconds', round(end-start, 4))
         else:
             logger.info('Skipped datetime feature conversion')
         return df
 
+    def _parse_datetime(self, df, feature):
+        # function that parses a feature to type datetime, returns None if the feature does not hold datetime values
+        values = df[feature]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values) or isinstance(values.dtype, pd.CategoricalDtype)):
+            return None
+        # probe the first non-missing value before parsing the whole feature
+        first = values.first_valid_index()
+        if first is None:
+            return None
+        try:
+            pd.to_datetime(values.loc[[first]])
+        except (ValueError, TypeError, OverflowError):
+            return None
+        try:
+            return pd.to_datetime(values, infer_datetime_format=True)
+        except (ValueError, TypeError, OverflowError):
+            return None
+
     def round_values(self, df, input_data):
         # function that checks datatypes of features and converts them if necessary
         if self.duplicates or self.missing_num or self.missing_categ or self.outliers or self.encode_categ or self.extract_datetime:
             logger.info('Started feature type conversion...')
             start = timer()
             counter = 0
-            cols_num = df.select_dtypes(include=np.number).columns
-            for feature in cols_num:
-                    # check if all values are integers
-                    if (df[feature].fillna(-9999) % 1  == 0).all():
+            # check which features only hold integer values
+            cols_int = [feature for feature in self._cols_num if self._int_like[feature]]
+            cols_float = [feature for feature in self._cols_num if not self._int_like[feature]]
+            if cols_int:
+                try:
+                    # encode FLOATs with only 0 as decimals to INT
+                    df[cols_int] = df[cols_int].astype('Int64')
+                    counter += len(cols_int)
+                    for feature in cols_int:
+                        logger.debug('Conversion to type INT succeeded for feature "{}"', feature)
+                except:
+                    # fall back to converting feature by feature, so that one failure does not stop the others
+                    for feature in cols_int:
                         try:
-                            # encode FLOATs with only 0 as decimals to INT
                             df[feature] = df[feature].astype('Int64')
                             counter += 1
                             logger.debug('Conversion to type INT succeeded for feature "{}"', feature)
                         except:
                             logger.warning('Conversion to type INT failed for feature "{}"', feature)
-                    else:
+            decimals = dict()
+            for feature in cols_float:
+                try:
+                    # round the number of decimals of FLOATs back to original
+                    dec = None
+                    for value in input_data[feature]:
+                        try:
+                            if dec == None:
+                                dec = str(value)[::-1].find('.')
+                            else:
+                                if str(value)[::-1].find('.') > dec:
+                                    dec = str(value)[::-1].find('.')
+                        except:
+                            pass
+                    if dec == None:
+                        raise ValueError
+                    decimals[feature] = dec
+                except:
+                    logger.warning('Conversion to type FLOAT failed for feature "{}"', feature)
+            if decimals:
+                cols_float = list(decimals)
+                try:
+                    df[cols_float] = df[cols_float].astype(float).round(decimals)
+                    counter += len(cols_float)
+                    for feature in cols_float:
+                        logger.debug('Conversion to type FLOAT succeeded for feature "{}"', feature)
+                except:
+                    # fall back to converting feature by feature, so that one failure does not stop the others
+                    for feature in cols_float:
                         try:
-                            df[feature] = df[feature].astype(float)
-                            # round the number of decimals of FLOATs back to original
-                            dec = None
-                            for value in input_data[feature]:
-                                try:
-                                    if dec == None:
-                                        dec = str(value)[::-1].find('.')
-                                    else:
-                                        if str(value)[::-1].find('.') > dec:
-                                            dec = str(value)[::-1].find('.')
-                                except:
-                                    pass
-                            df[feature] = df[feature].round(decimals = dec)
+                            df[feature] = df[feature].astype(float).round(decimals[feature])
                             counter += 1
                             logger.debug('Conversion to type FLOAT succeeded for feature "{}"', feature)
                         except:
@@ -441,7 +513,7 @@ class EncodeCateg:
             if not isinstance(self.encode_categ, list):
                 self.encode_categ = ['auto']
             # select non numeric features
-            cols_categ = set(df.columns) ^ set(df.select_dtypes(include=np.number).columns) 
+            cols_categ = df.columns.difference(df.select_dtypes(include=np.number).columns, sort=False)
             # check if all columns should be encoded
             if len(self.encode_categ) == 1:
                 target_cols = cols_categ # encode ALL columns
@@ -456,19 +528,19 @@ class EncodeCateg:
                 else:
                     # columns are indexes
                     feature = df.columns[feature]
-                try:
+                if EncodeCateg._is_datetime(self, df, feature):
                     # skip encoding of datetime features
-                    pd.to_datetime(df[feature])
                     logger.debug('Skipped encoding for DATETIME feature "{}"', feature)
-                except:
+                else:
                     try:
                         if self.encode_categ[0] == 'auto':
+                            n_unique = df[feature].nunique()
                             # ONEHOT encode if not more than 10 unique values to encode
-                            if df[feature].nunique() <=10:
+                            if n_unique <=10:
                                 df = EncodeCateg._to_onehot(self, df, feature)
                                 logger.debug('Encoding to ONEHOT succeeded for feature "{}"', feature)
                             # LABEL encode if not more than 20 unique values to encode
-                            elif df[feature].nunique() <=20:
+                            elif n_unique <=20:
                                 df = EncodeCateg._to_label(self, df, feature)
                                 logger.debug('Encoding to LABEL succeeded for feature "{}"', feature)
                             # skip encoding if more than 20 unique values to encode
@@ -476,10 +548,10 @@ class EncodeCateg:
                                 logger.debug('Encoding skipped for feature "{}"', feature)   
 
                         elif self.encode_categ[0] == 'onehot':
-                            df = EncodeCateg._to_onehot(df, feature)
+                            df = EncodeCateg._to_onehot(self, df, feature)
                             logger.debug('Encoding to {} succeeded for feature "{}"', str(self.encode_categ[0]).upper(), feature)
                         elif self.encode_categ[0] == 'label':
-                            df = EncodeCateg._to_label(df, feature)
+                            df = EncodeCateg._to_label(self, df, feature)
                             logger.debug('Encoding to {} succeeded for feature "{}"', str(self.encode_categ[0]).upper(), feature)      
                     except:
                         logger.warning('Encoding to {} failed for feature "{}"', str(self.encode_categ[0]).upper(), feature)    
@@ -489,29 +561,31 @@ class EncodeCateg:
             logger.info('Skipped encoding of categorical features')
         return df
 
+    def _is_datetime(self, df, feature):
+        # function that checks whether a feature holds datetime values
+        if feature in self._datetime_cols:
+            return True
+        if self.extract_datetime:
+            # all datetime features were already converted by Adjust.convert_datetime
+            return False
+        return Adjust._parse_datetime(self, df, feature) is not None
+
     def _to_onehot(self, df, feature, limit=10):  
         # function that encodes categorical features to OneHot encodings    
-        one_hot = pd.get_dummies(df[feature], prefix=feature)
+        one_hot = pd.get_dummies(df[feature], prefix=feature, dtype=np.uint8)
         if one_hot.shape[1] > limit:
             logger.warning('ONEHOT encoding for feature "{}" creates {} new features. Consider LABEL encoding instead.', feature, one_hot.shape[1])
         # join the encoded df
-        df = df.join(one_hot)
+        df = pd.concat([df, one_hot], axis=1, copy=False)
+        self._onehot_cols.update(one_hot.columns)
         return df
 
     def _to_label(self, df, feature):
         # function that encodes categorical features to label encodings 
-        le = preprocessing.LabelEncoder()
-
-        df[feature + '_lab'] = le.fit_transform(df[feature].values)
-        mapping = dict(zip(le.classes_, range(len(le.classes_))))
-        
-        for key in mapping:
-            try:
-                if isnan(key):               
-                    replace = {mapping[key] : key }
-                    df[feature].replace(replace, inplace=True)
-            except:
-                pass
+        # labels are the codes of the sorted observed values, missing values are coded as -1 and stay missing
+        # the values are passed as objects so the category order of 'category' features is not reused
+        codes = pd.Categorical(np.asarray(df[feature], dtype=object)).codes
+        df[feature + '_lab'] = np.where(codes == -1, np.nan, codes)
         return df  
 
 class Duplicates: